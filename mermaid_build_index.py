@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Mermaid 增量构建索引
+记录每个源文件的内容哈希、生成选项与输出结果，批量生成时跳过未变化的文件
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS renders (
+    source_path TEXT NOT NULL,
+    options TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    source_size INTEGER NOT NULL,
+    source_mtime INTEGER NOT NULL,
+    output_path TEXT NOT NULL,
+    output_hash TEXT NOT NULL,
+    render_time REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (source_path, options)
+) WITHOUT ROWID
+'''
+
+OUTPUT_INDEX = 'CREATE INDEX IF NOT EXISTS renders_output ON renders (output_path)'
+
+# 每记录这么多条结果提交一次，中途崩溃或中断时已完成的结果不会丢失
+COMMIT_INTERVAL = 100
+
+
+def file_hash(path):
+    """计算文件内容的 SHA-256 哈希"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot(source_file):
+    """
+    在生成之前记录源文件状态
+
+    先取文件状态再计算哈希：生成期间文件被修改时，记录的修改时间必然与之后的不同，
+    下次构建会重新计算哈希并发现变化，不会把旧内容的输出当作最新结果。
+
+    返回:
+        tuple: (内容哈希, 文件大小, 修改时间)
+    """
+    stat = os.stat(source_file)
+    return file_hash(source_file), stat.st_size, stat.st_mtime_ns
+
+
+def options_key(**options):
+    """将生成选项序列化为稳定的字符串，作为索引键的一部分"""
+    return json.dumps(options, sort_keys=True, separators=(',', ':'))
+
+
+class BuildIndex:
+    """
+    基于 SQLite 的构建索引
+
+    以 (源文件路径, 生成选项) 为键，记录源文件哈希、输出文件路径、输出文件哈希和生成耗时。
+    路径均为相对路径，索引文件随输出目录一起移动仍然有效。
+    """
+
+    def __init__(self, index_path, options):
+        self.index_path = index_path
+        self.options = options
+        self.conn = sqlite3.connect(index_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(SCHEMA)
+        self.conn.execute(OUTPUT_INDEX)
+        self._pending = 0
+        # 一次性读入当前选项下的全部记录，后续查询不再访问数据库
+        self.entries = {
+            row[0]: row[1:]
+            for row in self.conn.execute(
+                'SELECT source_path, source_hash, source_size, source_mtime, output_path, output_hash '
+                'FROM renders WHERE options = ?', (options,))
+        }
+
+    def check(self, source_path, source_file, output_file):
+        """
+        判断源文件是否需要重新生成
+
+        文件大小和修改时间均未变化时直接视为未变化，只有在它们变化时才重新计算内容哈希。
+
+        返回:
+            tuple: (是否需要生成, 需要生成时为生成前的 snapshot() 结果，否则为 None)
+        """
+        entry = self.entries.get(source_path)
+        if entry is None or not os.path.exists(output_file):
+            return True, snapshot(source_file)
+        source_hash, size, mtime = entry[0], entry[1], entry[2]
+        stat = os.stat(source_file)
+        if stat.st_size == size and stat.st_mtime_ns == mtime:
+            return False, None
+        current = snapshot(source_file)
+        if current[0] != source_hash:
+            return True, current
+        # 内容未变，只刷新记录中的文件状态，下次可直接跳过哈希计算
+        self.conn.execute(
+            'UPDATE renders SET source_size = ?, source_mtime = ? WHERE source_path = ? AND options = ?',
+            (current[1], current[2], source_path, self.options))
+        return False, None
+
+    def record(self, source_path, source_snapshot, output_path, output_file, render_time):
+        """
+        记录一次成功的生成结果
+
+        参数:
+            source_path (str): 源文件相对路径
+            source_snapshot (tuple): 生成之前取得的 snapshot() 结果
+            output_path (str): 输出文件相对路径
+            output_file (str): 输出文件实际路径
+            render_time (float): 生成耗时（秒）
+        """
+        source_hash, size, mtime = source_snapshot
+        output_hash = file_hash(output_file)
+        self.conn.execute(
+            'INSERT OR REPLACE INTO renders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (source_path, self.options, source_hash, size, mtime,
+             output_path, output_hash, render_time, time.time()))
+        self.entries[source_path] = (source_hash, size, mtime, output_path, output_hash)
+        # 输出文件已被覆盖，其他选项（如另一个渲染后端）下指向同一文件的记录随之失效
+        self.conn.execute(
+            'DELETE FROM renders WHERE output_path = ? AND options != ?', (output_path, self.options))
+        self._pending += 1
+        if self._pending >= COMMIT_INTERVAL:
+            self.conn.commit()
+            self._pending = 0
+
+    def prune(self, live_sources, output_dir):
+        """
+        删除源文件已不存在的记录及其输出文件
+
+        返回:
+            list: 被删除记录的源文件路径
+        """
+        stale = [path for path in self.entries if path not in live_sources]
+        for source_path in stale:
+            output_file = os.path.join(output_dir, self.entries.pop(source_path)[3])
+            if os.path.exists(output_file):
+                os.unlink(output_file)
+        self.conn.executemany(
+            'DELETE FROM renders WHERE source_path = ? AND options = ?',
+            [(path, self.options) for path in stale])
+        return stale
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
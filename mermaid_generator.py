@@ -8,9 +8,23 @@ import os
 import argparse
 import tempfile
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from mermaid_splitter import split_flowchart, SplitError
+from mermaid_build_index import BuildIndex, options_key, snapshot
+
+# 预热渲染器时使用的最小示例图
+WARMUP_DIAGRAM = "graph TD; A-->B;"
+
+# 批量生成时构建索引的默认文件名，位于输出目录下
+BUILD_INDEX_NAME = ".mermaid-build-index.db"
 
 class MermaidGenerator:
+    # 渲染后端名称，不同后端的输出不同，构建索引以此区分
+    backend = "mmdc"
+    
     def __init__(self):
         # 检查是否安装了必要的依赖
         self._check_dependencies()
@@ -73,6 +87,53 @@ class MermaidGenerator:
                 os.unlink(output_path)
             return None
     
+    def warm_up(self):
+        """
+        渲染一个最小示例图，确认渲染器可用
+        
+        每次生成都会启动新的 mmdc 进程，因此这里不会留下常驻的渲染进程；
+        预热的作用是把 Node.js 模块和 Chromium 读入操作系统的文件缓存，
+        使首次生成不必再从磁盘冷加载。
+        
+        返回:
+            bool: 预热是否成功
+        """
+        output_path = self.generate_from_text(WARMUP_DIAGRAM)
+        if output_path is None:
+            return False
+        os.unlink(output_path)
+        return True
+    
+    def warm_up_in_background(self, callback=None, attempts=1, backoff=1.0):
+        """
+        在后台线程中预热渲染器
+        
+        参数:
+            callback (callable): 预热结束后调用，参数为预热是否成功
+            attempts (int): 最多尝试次数
+            backoff (float): 首次重试前等待的秒数，之后每次加倍
+            
+        返回:
+            threading.Thread: 预热线程
+        """
+        def run():
+            delay = backoff
+            ok = False
+            for attempt in range(attempts):
+                if attempt > 0:
+                    print(f"渲染器预热失败，{delay:g} 秒后重试")
+                    time.sleep(delay)
+                    delay *= 2
+                ok = self.warm_up()
+                if ok:
+                    break
+            if callback is not None:
+                callback(ok)
+        
+        thread = threading.Thread(target=run, name="mermaid-warmup", daemon=True)
+        thread.start()
+        return thread
+    
     def generate_from_file(self, input_file, output_path=None, format="png"):
         """
         从包含 Mermaid 语法的文件生成流程图
@@ -95,6 +156,147 @@ class MermaidGenerator:
             output_path = str(input_path.with_suffix(f'.{format}'))
         
         return self.generate_from_text(mermaid_text, output_path, format)
+    
+    def generate_split(self, mermaid_text, output_dir=None, format="png", max_nodes=200, max_workers=None):
+        """
+        将节点过多的流程图拆分为多个子图并行生成，并生成带链接的索引图
+        
+        参数:
+            mermaid_text (str): Mermaid 语法文本
+            output_dir (str): 输出目录，如果为 None，则使用临时目录
+            format (str): 输出格式 (png, svg, pdf)
+            max_nodes (int): 每个子图的最大节点数，至少为 1
+            max_workers (int): 并行生成的进程数，如果为 None，则使用 CPU 核数
+            
+        返回:
+            str: 索引图文件路径，索引图总是 SVG 格式以保留可点击的链接；
+                 如果无需拆分，则返回完整流程图的文件路径
+        """
+        if output_dir is None:
+            output_dir = tempfile.mkdtemp(prefix='mermaid_parts_')
+        os.makedirs(output_dir, exist_ok=True)
+        
+        try:
+            split = split_flowchart(mermaid_text, max_nodes, f'part_{{:03d}}.{format}')
+        except SplitError as e:
+            print(f"警告: 无法拆分流程图 ({e})，将生成完整流程图，节点较多时可能很慢")
+            split = None
+        if split is None:
+            # 节点数未超过上限或无法拆分，直接生成完整流程图
+            return self.generate_from_text(mermaid_text, os.path.join(output_dir, f'index.{format}'), format)
+        
+        part_texts, index_text = split
+        part_paths = [os.path.join(output_dir, f'part_{i + 1:03d}.{format}') for i in range(len(part_texts))]
+        
+        # mmdc 为独立进程，使用线程池即可并行生成各部分
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            results = list(executor.map(
+                lambda args: self.generate_from_text(args[0], args[1], format),
+                zip(part_texts, part_paths)
+            ))
+        
+        if None in results:
+            print("部分子图生成失败")
+            return None
+        
+        print(f"流程图已拆分为 {len(part_texts)} 个部分: {output_dir}")
+        # 只有 SVG 中的链接可以点击，因此索引图不跟随输出格式
+        return self.generate_from_text(index_text, os.path.join(output_dir, 'index.svg'), 'svg')
+
+    def generate_batch(self, input_dir, output_dir=None, format="png", index_path=None, max_workers=None, force=False):
+        """
+        批量生成目录下的所有 .mmd 文件，借助构建索引只生成新增或内容变化的文件
+        
+        参数:
+            input_dir (str): 包含 .mmd 文件的目录
+            output_dir (str): 输出目录，如果为 None，则输出到输入目录
+            format (str): 输出格式 (png, svg, pdf)
+            index_path (str): 构建索引文件路径，如果为 None，则使用输出目录下的默认文件
+            max_workers (int): 并行生成的进程数，如果为 None，则使用 CPU 核数
+            force (bool): 忽略索引，重新生成所有文件
+            
+        返回:
+            dict: 按 added、updated、removed、unchanged、failed 分类的源文件相对路径
+        """
+        if output_dir is None:
+            output_dir = input_dir
+        os.makedirs(output_dir, exist_ok=True)
+        if index_path is None:
+            index_path = os.path.join(output_dir, BUILD_INDEX_NAME)
+        
+        sources = []
+        for root, _, files in os.walk(input_dir):
+            for name in files:
+                if name.endswith('.mmd'):
+                    sources.append(os.path.relpath(os.path.join(root, name), input_dir))
+        sources.sort()
+        
+        index = BuildIndex(index_path, options_key(format=format, backend=self.backend))
+        changes = {'added': [], 'updated': [], 'removed': [], 'unchanged': [], 'failed': []}
+        
+        def render(job):
+            source, source_file, _, _, output_file = job
+            started = time.perf_counter()
+            try:
+                os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+                result = self.generate_from_file(source_file, output_file, format)
+            except Exception as e:
+                # 单个文件出错（如编码错误）只记为失败，不影响其余文件
+                print(f"生成流程图时出错: {source}: {e}")
+                result = None
+            return result, time.perf_counter() - started
+        
+        # 无论成功、失败还是被中断，都关闭索引以保存已完成的记录
+        try:
+            todo = []
+            for source in sources:
+                output = str(Path(source).with_suffix(f'.{format}'))
+                source_file = os.path.join(input_dir, source)
+                output_file = os.path.join(output_dir, output)
+                try:
+                    # 在生成之前取得源文件状态，记录的哈希与生成时读取的内容一致
+                    if force:
+                        needed, source_snapshot = True, snapshot(source_file)
+                    else:
+                        needed, source_snapshot = index.check(source, source_file, output_file)
+                except OSError as e:
+                    print(f"读取源文件时出错: {source}: {e}")
+                    changes['failed'].append(source)
+                    continue
+                if needed:
+                    todo.append((source, source_file, source_snapshot, output, output_file))
+                else:
+                    changes['unchanged'].append(source)
+            
+            # mmdc 为独立进程，使用线程池并行生成；索引只在主线程中写入
+            with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+                for job, (result, elapsed) in zip(todo, executor.map(render, todo)):
+                    source, source_file, source_snapshot, output, output_file = job
+                    if result is None:
+                        changes['failed'].append(source)
+                        continue
+                    kind = 'updated' if source in index.entries else 'added'
+                    index.record(source, source_snapshot, output, output_file, elapsed)
+                    changes[kind].append(source)
+            
+            changes['removed'] = index.prune(set(sources), output_dir)
+        finally:
+            index.close()
+        
+        for kind, mark in (('added', '+'), ('updated', '~'), ('removed', '-'), ('failed', '!')):
+            for source in changes[kind]:
+                print(f"  {mark} {source}")
+        print(f"构建完成: 新增 {len(changes['added'])}, 更新 {len(changes['updated'])}, "
+              f"删除 {len(changes['removed'])}, 未变化 {len(changes['unchanged'])}, "
+              f"失败 {len(changes['failed'])}")
+        return changes
+
+def _positive_int(value):
+    """argparse 参数类型：至少为 1 的整数"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'必须至少为 1: {value}')
+    return number
 
 def main():
     parser = argparse.ArgumentParser(description='Mermaid 流程图生成工具')
@@ -102,19 +304,51 @@ def main():
     input_group = parser.add_mutually_exclusive_group(required=True)
     input_group.add_argument('-t', '--text', help='Mermaid 语法文本')
     input_group.add_argument('-f', '--file', help='包含 Mermaid 语法的文件路径')
+    input_group.add_argument('-d', '--dir', help='批量生成目录下的所有 .mmd 文件，此时 -o 为输出目录')
     
     parser.add_argument('-o', '--output', help='输出文件路径')
     parser.add_argument('--format', choices=['png', 'svg', 'pdf'], default='png',
                         help='输出格式 (默认: png)')
+    parser.add_argument('--split', action='store_true',
+                        help='将节点过多的流程图拆分为多个子图，此时 -o 为输出目录')
+    parser.add_argument('--max-nodes', type=_positive_int, default=200,
+                        help='拆分时每个子图的最大节点数 (默认: 200)')
+    parser.add_argument('-j', '--jobs', type=_positive_int,
+                        help='拆分或批量生成时并行生成的进程数 (默认: CPU 核数)')
+    parser.add_argument('--index', help=f'批量生成时使用的构建索引文件 (默认: 输出目录下的 {BUILD_INDEX_NAME})')
+    parser.add_argument('--force', action='store_true',
+                        help='批量生成时忽略构建索引，重新生成所有文件')
+    parser.add_argument('--backend', choices=['mmdc', 'node'], default='mmdc',
+                        help='渲染后端: mmdc 每次启动 mermaid-cli；node 使用常驻 Node.js 进程直接生成 SVG (默认: mmdc)')
+    parser.add_argument('--mermaid-bundle',
+                        help='node 后端加载的 mermaid.js 打包文件 (默认: Node.js 可解析到的 mermaid 包)')
     
     args = parser.parse_args()
     
-    generator = MermaidGenerator()
+    if args.backend == 'node':
+        from mermaid_node_backend import NodeMermaidGenerator
+        generator = NodeMermaidGenerator(args.mermaid_bundle)
+    else:
+        generator = MermaidGenerator()
     
-    if args.text:
+    if args.dir:
+        generator.generate_batch(args.dir, args.output, args.format, args.index, args.jobs, args.force)
+    elif args.split:
+        if args.text:
+            mermaid_text = args.text
+            output_dir = args.output
+        else:
+            with open(args.file, 'r') as f:
+                mermaid_text = f.read()
+            output_dir = args.output or str(Path(args.file).with_suffix('')) + '_parts'
+        generator.generate_split(mermaid_text, output_dir, args.format, args.max_nodes, args.jobs)
+    elif args.text:
         generator.generate_from_text(args.text, args.output, args.format)
     elif args.file:
         generator.generate_from_file(args.file, args.output, args.format)
+    
+    if args.backend == 'node':
+        generator.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -5,6 +5,7 @@ Mermaid 流程图生成工具 - GUI 界面
 
 import os
 import sys
+import argparse
 import tempfile
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
@@ -15,8 +16,11 @@ from mermaid_generator import MermaidGenerator
 # 抑制 macOS Tkinter 弃用警告
 os.environ['TK_SILENCE_DEPRECATION'] = '1'
 
+# 预热期间状态栏显示的文字
+WARMUP_STATUS = "正在预热渲染器..."
+
 class MermaidGUI:
-    def __init__(self, root):
+    def __init__(self, root, warmup=False):
         self.root = root
         self.root.title("Mermaid 流程图生成工具")
         self.root.geometry("1000x800")
@@ -34,6 +38,19 @@ class MermaidGUI:
         
         self._create_widgets()
         
+        if warmup:
+            self.status_var.set(WARMUP_STATUS)
+            self.generator.warm_up_in_background(self._on_warmup_finished)
+        
+    def _on_warmup_finished(self, ok):
+        """预热结束后在主线程中更新状态栏"""
+        self.root.after(0, self._show_warmup_result, ok)
+    
+    def _show_warmup_result(self, ok):
+        # 用户在预热期间已生成流程图时，保留其状态信息
+        if self.status_var.get() == WARMUP_STATUS:
+            self.status_var.set("就绪" if ok else "渲染器预热失败")
+    
     def _create_widgets(self):
         # 创建主框架
         main_frame = ttk.Frame(self.root, padding="10")
@@ -193,6 +210,11 @@ class MermaidGUI:
         self.status_var.set("就绪")
 
 def main():
+    parser = argparse.ArgumentParser(description='Mermaid 流程图生成工具 - GUI 界面')
+    parser.add_argument('--warmup', action='store_true',
+                        help='启动时在后台预热渲染器，减少首次生成的等待时间')
+    args = parser.parse_args()
+    
     try:
         # 检查依赖
         subprocess.run(["mmdc", "--version"], 
@@ -207,7 +229,7 @@ def main():
         sys.exit(1)
     
     root = tk.Tk()
-    app = MermaidGUI(root)
+    app = MermaidGUI(root, warmup=args.warmup)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Mermaid 流程图生成工具 - 常驻 Node.js 渲染后端
+通过管道连接一个常驻的 Node.js 进程直接渲染 SVG，避免每次生成都启动 mmdc 和浏览器
+"""
+
+import os
+import json
+import queue
+import tempfile
+import threading
+import subprocess
+from mermaid_generator import MermaidGenerator
+
+# 常驻渲染进程的脚本，与本模块位于同一目录
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mermaid_render_server.js')
+
+# 等待渲染进程启动或返回单个结果的最长秒数，超时后结束进程
+RENDER_TIMEOUT = 30
+
+
+def _parse_message(line):
+    """解析渲染进程输出的一行 JSON，不符合协议时返回带 error 的消息"""
+    try:
+        message = json.loads(line)
+    except ValueError:
+        message = None
+    if not isinstance(message, dict):
+        return {'error': f'无法识别的输出: {line.strip()[:200]}'}
+    return message
+
+
+def _read_lines(stream, lines):
+    """把渲染进程的输出逐行放入队列，进程退出时放入空字符串"""
+    for line in stream:
+        lines.put(line)
+    lines.put('')
+
+
+class NodeMermaidGenerator(MermaidGenerator):
+    """
+    使用常驻 Node.js 进程渲染的生成器，接口与 MermaidGenerator 相同
+
+    SVG 由常驻进程中加载的 mermaid.js 直接生成；PNG 和 PDF 需要栅格化，仍交给 mmdc。
+    常驻进程无法启动时，SVG 也回退到 mmdc。
+    """
+
+    backend = "node"
+
+    def __init__(self, bundle_path=None, node="node", timeout=RENDER_TIMEOUT):
+        """
+        参数:
+            bundle_path (str): mermaid.js 打包文件路径，如果为 None，则使用 Node.js 可解析到的 mermaid 包
+            node (str): Node.js 可执行文件
+            timeout (float): 等待启动或单个渲染结果的最长秒数
+        """
+        self.bundle_path = bundle_path
+        self.node = node
+        self.timeout = timeout
+        self._process = None
+        self._lines = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._start_failed = False
+        self._mmdc_checked = False
+        super().__init__()
+
+    def _check_dependencies(self):
+        """检查是否安装了 Node.js，mmdc 仅在生成 PNG/PDF 时才需要"""
+        try:
+            subprocess.run([self.node, "--version"],
+                          stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE)
+        except FileNotFoundError:
+            print("错误: 未找到 Node.js。")
+            print("请先安装 Node.js: https://nodejs.org/")
+            exit(1)
+
+    def _start_process(self):
+        """启动常驻渲染进程，返回是否成功"""
+        args = [self.node, SERVER_SCRIPT]
+        if self.bundle_path:
+            args.append(self.bundle_path)
+        self._process = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+            encoding='utf-8'
+        )
+        # 由单独的线程读取输出，主线程可以带超时地等待
+        self._lines = queue.Queue()
+        reader = threading.Thread(
+            target=_read_lines,
+            args=(self._process.stdout, self._lines),
+            name="mermaid-node-reader",
+            daemon=True
+        )
+        reader.start()
+
+        line = self._read_line()
+        if line is None:
+            message = {'error': f'{self.timeout:g} 秒内未就绪'}
+        else:
+            message = _parse_message(line or '{"error": "进程意外退出"}')
+        if not message.get('ready'):
+            print(f"启动 Node.js 渲染进程失败: {message.get('error')}")
+            self._kill_process()
+            self._start_failed = True
+            return False
+        return True
+
+    def _read_line(self):
+        """读取渲染进程输出的一行，进程退出时返回空字符串，超时返回 None"""
+        try:
+            return self._lines.get(timeout=self.timeout)
+        except queue.Empty:
+            return None
+
+    def _kill_process(self):
+        """结束渲染进程，下次渲染时重新启动"""
+        self._process.kill()
+        self._process.wait()
+        self._process = None
+        self._lines = None
+
+    def render_svg(self, mermaid_text):
+        """
+        在常驻进程中渲染 SVG
+
+        参数:
+            mermaid_text (str): Mermaid 语法文本
+
+        返回:
+            str: SVG 文本，渲染失败时返回 None
+        """
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                if self._start_failed or not self._start_process():
+                    raise RuntimeError("Node.js 渲染进程不可用")
+
+            self._next_id += 1
+            request_id = self._next_id
+            try:
+                self._process.stdin.write(json.dumps({'id': request_id, 'text': mermaid_text}) + '\n')
+                self._process.stdin.flush()
+            except OSError:
+                # 进程在检查之后退出时写入会遇到 BrokenPipeError
+                print("生成流程图时出错: Node.js 渲染进程意外退出")
+                self._kill_process()
+                return None
+
+            line = self._read_line()
+            if line is None:
+                print(f"生成流程图时出错: {self.timeout:g} 秒内未返回结果")
+                self._kill_process()
+                return None
+            if not line:
+                print("生成流程图时出错: Node.js 渲染进程意外退出")
+                self._kill_process()
+                return None
+            message = _parse_message(line)
+            if message.get('id') != request_id:
+                # 输出不符合协议，后续响应无法再与请求对应，重启进程
+                print(f"生成流程图时出错: {message.get('error', '响应与请求不对应')}")
+                self._kill_process()
+                return None
+
+        if 'error' in message:
+            print(f"生成流程图时出错: {message['error']}")
+            return None
+        return message.get('svg')
+
+    def generate_from_text(self, mermaid_text, output_path=None, format="png"):
+        """
+        从 Mermaid 文本生成流程图，参数与返回值同 MermaidGenerator.generate_from_text
+        """
+        if format == "svg":
+            try:
+                svg = self.render_svg(mermaid_text)
+            except RuntimeError as e:
+                print(f"{e}，改用 mmdc 生成")
+            else:
+                if svg is None:
+                    return None
+                if output_path is None:
+                    output_path = tempfile.mktemp(suffix='.svg')
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(svg)
+                print(f"成功生成流程图: {output_path}")
+                return output_path
+
+        # 栅格化输出仍需 mmdc，首次使用时再检查
+        if not self._mmdc_checked:
+            MermaidGenerator._check_dependencies(self)
+            self._mmdc_checked = True
+        return super().generate_from_text(mermaid_text, output_path, format)
+
+    def close(self):
+        """关闭常驻渲染进程"""
+        with self._lock:
+            if self._process is not None:
+                try:
+                    self._process.stdin.close()
+                    self._process.wait(timeout=self.timeout)
+                except (OSError, subprocess.TimeoutExpired):
+                    self._process.kill()
+                    self._process.wait()
+                self._process = None
+                self._lines = None
@@ -0,0 +1,114 @@
+#!/usr/bin/env node
+/*
+ * Mermaid 常驻渲染进程
+ * 启动时加载一次 mermaid.js，之后从标准输入逐行读取 JSON 请求 {"id": ..., "text": ...}，
+ * 向标准输出逐行写入 {"id": ..., "svg": ...} 或 {"id": ..., "error": ...}
+ *
+ * 用法: node mermaid_render_server.js [mermaid 打包文件路径]
+ */
+'use strict';
+
+const fs = require('fs');
+const vm = require('vm');
+const readline = require('readline');
+const { Console } = require('console');
+
+// 估算文本宽度时每个字符的像素数，jsdom 不做布局，只能近似
+const CHAR_WIDTH = 8;
+const LINE_HEIGHT = 16;
+
+// 标准输出专用于协议，打包文件的日志一律写到标准错误
+const bundleConsole = new Console({ stdout: process.stderr, stderr: process.stderr });
+
+function send(message) {
+  process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+function resolveBundle() {
+  if (process.argv[2]) {
+    return process.argv[2];
+  }
+  return require.resolve('mermaid/dist/mermaid.min.js');
+}
+
+function createContext() {
+  let jsdom = null;
+  try {
+    jsdom = require('jsdom');
+  } catch (e) {
+    // 未安装 jsdom 时使用空白上下文，适用于不依赖 DOM 的替身打包文件
+  }
+
+  if (jsdom === null) {
+    const sandbox = { console: bundleConsole, setTimeout, clearTimeout };
+    sandbox.window = sandbox;
+    return vm.createContext(sandbox);
+  }
+
+  const virtualConsole = new jsdom.VirtualConsole();
+  virtualConsole.sendTo(bundleConsole);
+  const dom = new jsdom.JSDOM('<!DOCTYPE html><html><body></body></html>', {
+    runScripts: 'outside-only',
+    pretendToBeVisual: true,
+    virtualConsole: virtualConsole,
+  });
+  const proto = dom.window.SVGElement.prototype;
+  proto.getBBox = function () {
+    const text = this.textContent || '';
+    return { x: 0, y: 0, width: text.length * CHAR_WIDTH, height: LINE_HEIGHT };
+  };
+  proto.getComputedTextLength = function () {
+    return (this.textContent || '').length * CHAR_WIDTH;
+  };
+  return dom.getInternalVMContext();
+}
+
+function loadMermaid() {
+  const bundle = resolveBundle();
+  const context = createContext();
+  vm.runInContext(fs.readFileSync(bundle, 'utf8'), context, { filename: bundle });
+  const mermaid = vm.runInContext('globalThis.mermaid', context);
+  if (!mermaid || typeof mermaid.render !== 'function') {
+    throw new Error('打包文件未提供 mermaid.render: ' + bundle);
+  }
+  // HTML 标签依赖 getBoundingClientRect，jsdom 中恒为 0；改用 SVG 文本，由上面的 getBBox 近似测量
+  mermaid.initialize({ startOnLoad: false, htmlLabels: false, flowchart: { htmlLabels: false } });
+  return mermaid;
+}
+
+async function render(mermaid, request) {
+  try {
+    const result = await mermaid.render('mermaid-' + request.id, request.text);
+    const svg = typeof result === 'string' ? result : result.svg;
+    send({ id: request.id, svg: svg });
+  } catch (e) {
+    send({ id: request.id, error: String(e && e.message ? e.message : e) });
+  }
+}
+
+function main() {
+  let mermaid;
+  try {
+    mermaid = loadMermaid();
+  } catch (e) {
+    send({ error: String(e && e.message ? e.message : e) });
+    process.exit(1);
+  }
+  send({ ready: true });
+
+  // mermaid.render 不可重入，请求按顺序逐个处理
+  let queue = Promise.resolve();
+  const lines = readline.createInterface({ input: process.stdin });
+  lines.on('line', (line) => {
+    if (!line.trim()) {
+      return;
+    }
+    const request = JSON.parse(line);
+    queue = queue.then(() => render(mermaid, request));
+  });
+  lines.on('close', () => {
+    queue.then(() => process.exit(0));
+  });
+}
+
+main();
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Mermaid 流程图拆分工具
+将节点过多的流程图拆分为多个规模受限的子图，并生成带链接的索引图
+"""
+
+import re
+from collections import OrderedDict, deque
+
+# 流程图头部，例如 "graph TD" 或 "flowchart LR"
+HEADER_RE = re.compile(r'^(graph|flowchart)\b\s*(\w+)?\s*$', re.IGNORECASE)
+
+# 节点或子图ID，允许以单个连字符连接，例如 my-node
+NODE_ID = r'\w+(?:-\w+)*'
+
+# 节点形状，例如 [文本]、(文本)、{文本}、((文本))、[(文本)] 等
+SHAPE = (r'\[\[.*?\]\]|\[\(.*?\)\]|\(\(\(.*?\)\)\)|\(\(.*?\)\)|\(\[.*?\]\)'
+         r'|\{\{.*?\}\}|\[/.*?[/\\]\]|\[\\.*?[/\\]\]|\[.*?\]|\(.*?\)|\{.*?\}|>.*?\]')
+NODE_RE = re.compile(r'\s*(' + NODE_ID + r')\s*((?:' + SHAPE + r')?(?::::\w+)?)\s*')
+
+# 连线，例如 -->、---、-.->、==>、--o、<-->，可带 |文本|
+LINK_RE = re.compile(r'\s*[<ox]?(?:-{2,}[->ox]?|={2,}[=>ox]?|-\.+-[>ox]?|~~~)(?:\s*\|[^|]*\|)?\s*')
+# 中间带文本的连线，例如 "-- 文本 -->"
+# 紧跟在 -- 之后的 o/x 是箭头（如 "--o B"），以空格隔开的 o/x 则是文本（如 "-- o --> B"）
+LINK_TEXT_RE = re.compile(r'\s*[<ox]?(?:--|==|-\.)(?![ox]\s)\s*[^-=.>\s][^|]*?\s*'
+                          r'(?:-{2,}[->ox]?|={2,}[=>ox]?|\.-+[>ox]?)\s*')
+
+# 子图声明中的ID，例如 "subgraph one [标题]" 或 "subgraph one"
+SUBGRAPH_ID_RE = re.compile(r'^subgraph\s+(' + NODE_ID + r')\s*(?:\[.*\])?\s*$')
+
+# 初始化指令，例如 %%{init: {"theme": "dark"}}%%，拆分后的每个部分都需要保留
+DIRECTIVE_PREFIX = '%%{'
+
+# 以这些关键字开头的语句按节点归属处理
+NODE_KEYWORDS = ('style', 'click')
+
+
+class SplitError(ValueError):
+    """流程图无法解析，因而无法拆分"""
+
+
+def _split_statements(mermaid_text):
+    """按换行和括号/引号外的分号拆分语句，丢弃注释，保留初始化指令"""
+    statements = []
+    closing = {'[': ']', '(': ')', '{': '}'}
+    for line in mermaid_text.splitlines():
+        if line.strip().startswith(DIRECTIVE_PREFIX):
+            statements.append(line.strip())
+            continue
+        stack = []
+        in_quote = False
+        current = ''
+        for ch in line:
+            if ch == '"':
+                in_quote = not in_quote
+            elif not in_quote:
+                if ch in closing:
+                    stack.append(closing[ch])
+                elif stack and ch == stack[-1]:
+                    stack.pop()
+                elif ch == ';' and not stack:
+                    statements.append(current.strip())
+                    current = ''
+                    continue
+            current += ch
+        statements.append(current.strip())
+    return [s for s in statements
+            if s and (s.startswith(DIRECTIVE_PREFIX) or not s.startswith('%%'))]
+
+
+def _parse_group(statement, pos):
+    """解析以 & 连接的一组节点，返回 ([(节点ID, 形状)], 新位置)"""
+    group = []
+    while True:
+        match = NODE_RE.match(statement, pos)
+        if not match:
+            return None, pos
+        group.append((match.group(1), match.group(2)))
+        pos = match.end()
+        if statement.startswith('&', pos):
+            pos += 1
+            continue
+        return group, pos
+
+
+def _parse_chain(statement):
+    """解析节点或连线语句，例如 A[开始] --> B & C -->|是| D"""
+    groups = []
+    links = []
+    group, pos = _parse_group(statement, 0)
+    if group is None:
+        return None
+    groups.append(group)
+    while pos < len(statement):
+        match = LINK_TEXT_RE.match(statement, pos) or LINK_RE.match(statement, pos)
+        if not match:
+            return None
+        links.append(match.group(0).strip())
+        group, pos = _parse_group(statement, match.end())
+        if group is None:
+            return None
+        groups.append(group)
+    return groups, links
+
+
+class FlowGraph:
+    """解析后的流程图结构"""
+
+    def __init__(self, direction):
+        self.direction = direction
+        self.directives = []            # 初始化指令，原样放在每个部分和索引图的开头
+        self.nodes = OrderedDict()      # 节点ID -> 形状文本
+        self.owner = {}                 # 节点ID -> 所属顶层子图序号，None 表示不在子图中
+        self.subgraphs = []             # 顶层子图的 "subgraph ..." 语句
+        self.subgraph_ids = {}          # 子图ID -> 所属顶层子图序号，连线端点可以是子图ID
+        self.top_subgraph_ids = set()   # 顶层子图的ID，拆分后只有它们仍以子图形式存在
+        self.edges = []                 # (起点, 连线, 终点)
+        self.class_defs = []            # classDef 语句，每个部分都需要
+        self.node_statements = {}       # 节点ID -> style/class/click 语句
+
+    def _add_node(self, node_id, shape, subgraph):
+        if node_id not in self.nodes:
+            self.nodes[node_id] = shape
+            self.owner[node_id] = subgraph
+        elif shape and not self.nodes[node_id]:
+            self.nodes[node_id] = shape
+
+    def _add_statement(self, node_id, statement):
+        self.node_statements.setdefault(node_id, []).append(statement)
+
+    @classmethod
+    def parse(cls, mermaid_text):
+        """
+        解析流程图文本
+
+        返回:
+            FlowGraph: 解析结果
+
+        异常:
+            SplitError: 不是流程图或包含无法识别的语句
+        """
+        statements = _split_statements(mermaid_text)
+        directives = [s for s in statements if s.startswith(DIRECTIVE_PREFIX)]
+        statements = [s for s in statements if not s.startswith(DIRECTIVE_PREFIX)]
+        header = HEADER_RE.match(statements[0]) if statements else None
+        if not header:
+            raise SplitError('只支持拆分 graph/flowchart 流程图')
+
+        graph = cls(header.group(2) or 'TD')
+        graph.directives = directives
+        depth = 0
+        current = None
+        for statement in statements[1:]:
+            keyword = statement.split(None, 1)[0]
+            if keyword == 'subgraph':
+                if depth == 0:
+                    graph.subgraphs.append(statement)
+                    current = len(graph.subgraphs) - 1
+                subgraph_id = SUBGRAPH_ID_RE.match(statement)
+                if subgraph_id:
+                    graph.subgraph_ids[subgraph_id.group(1)] = current
+                    if depth == 0:
+                        graph.top_subgraph_ids.add(subgraph_id.group(1))
+                depth += 1
+            elif keyword == 'end':
+                depth = max(depth - 1, 0)
+                if depth == 0:
+                    current = None
+            elif keyword == 'direction':
+                # 嵌套子图被展开，子图内的方向声明不再适用
+                continue
+            elif keyword == 'linkStyle':
+                # 连线序号在拆分后会变化，无法保留
+                continue
+            elif keyword == 'classDef':
+                graph.class_defs.append(statement)
+            elif keyword == 'class':
+                parts = statement.split()
+                if len(parts) >= 3:
+                    for node_id in parts[1].split(','):
+                        graph._add_statement(node_id, 'class {} {}'.format(node_id, parts[2]))
+            elif keyword in NODE_KEYWORDS:
+                parts = statement.split(None, 2)
+                if len(parts) >= 2:
+                    graph._add_statement(parts[1], statement)
+            else:
+                chain = _parse_chain(statement)
+                if chain is None:
+                    raise SplitError(f'无法解析的语句: {statement}')
+                groups, links = chain
+                for group in groups:
+                    for node_id, shape in group:
+                        graph._add_node(node_id, shape, current)
+                for i, link in enumerate(links):
+                    for src, _ in groups[i]:
+                        for dst, _ in groups[i + 1]:
+                            graph.edges.append((src, link, dst))
+
+        # 作为连线端点出现的子图ID不是节点
+        for subgraph_id in graph.subgraph_ids:
+            if subgraph_id in graph.nodes:
+                del graph.nodes[subgraph_id]
+                del graph.owner[subgraph_id]
+        return graph
+
+    def _adjacency(self):
+        adjacency = {node_id: [] for node_id in self.nodes}
+        for src, _, dst in self.edges:
+            if src not in adjacency or dst not in adjacency:
+                continue
+            adjacency[src].append(dst)
+            adjacency[dst].append(src)
+        return adjacency
+
+    def partition(self, max_nodes):
+        """
+        将节点划分为若干部分，每部分不超过 max_nodes 个节点
+
+        优先按顶层子图分组，不在子图中的节点按连通分量分组；
+        超出上限的分组按广度优先顺序切块，使相邻节点尽量落在同一部分，
+        再把相邻的小分组合并，避免产生大量零碎的子图。
+
+        返回:
+            list: 每个部分的节点ID列表
+        """
+        adjacency = self._adjacency()
+
+        buckets = [[] for _ in self.subgraphs]
+        loose = []
+        for node_id in self.nodes:
+            owner = self.owner[node_id]
+            if owner is None:
+                loose.append(node_id)
+            else:
+                buckets[owner].append(node_id)
+        buckets.extend(_components(loose, adjacency))
+
+        pieces = []
+        for bucket in buckets:
+            if not bucket:
+                continue
+            order = _bfs_order(bucket, adjacency)
+            for start in range(0, len(order), max_nodes):
+                pieces.append(order[start:start + max_nodes])
+
+        parts = []
+        for piece in pieces:
+            if parts and len(parts[-1]) + len(piece) <= max_nodes:
+                parts[-1].extend(piece)
+            else:
+                parts.append(list(piece))
+        return parts
+
+    def render_part(self, members):
+        """生成只包含指定节点及其内部连线的 Mermaid 文本"""
+        member_set = set(members)
+        owners = set(self.owner[node_id] for node_id in members)
+        # 本部分包含其节点的顶层子图，连线可以直接指向这些子图
+        member_set.update(subgraph_id for subgraph_id in self.top_subgraph_ids
+                          if self.subgraph_ids[subgraph_id] in owners)
+        lines = self.directives + ['graph {}'.format(self.direction)]
+
+        by_subgraph = OrderedDict()
+        for node_id in members:
+            by_subgraph.setdefault(self.owner[node_id], []).append(node_id)
+        for owner, node_ids in by_subgraph.items():
+            indent = '    '
+            if owner is not None:
+                lines.append('    ' + self.subgraphs[owner])
+                indent = '        '
+            for node_id in node_ids:
+                lines.append(indent + node_id + self.nodes[node_id])
+            if owner is not None:
+                lines.append('    end')
+
+        for src, link, dst in self.edges:
+            if src in member_set and dst in member_set:
+                lines.append('    {} {} {}'.format(src, link, dst))
+        for statement in self.class_defs:
+            lines.append('    ' + statement)
+        for node_id in members:
+            for statement in self.node_statements.get(node_id, []):
+                lines.append('    ' + statement)
+        return '\n'.join(lines) + '\n'
+
+    def render_index(self, parts, link_template):
+        """生成索引图，每个部分一个可点击节点，跨部分连线按数量汇总"""
+        part_of = {}
+        subgraph_part = {}
+        for i, members in enumerate(parts):
+            for node_id in members:
+                part_of[node_id] = i
+                # 子图被切分到多个部分时，指向子图的连线归到它的第一个部分
+                subgraph_part.setdefault(self.owner[node_id], i)
+        for subgraph_id, owner in self.subgraph_ids.items():
+            if owner in subgraph_part:
+                part_of[subgraph_id] = subgraph_part[owner]
+
+        cross = OrderedDict()
+        for src, _, dst in self.edges:
+            if src not in part_of or dst not in part_of:
+                continue
+            key = (part_of[src], part_of[dst])
+            if key[0] != key[1]:
+                cross[key] = cross.get(key, 0) + 1
+
+        lines = self.directives + ['graph {}'.format(self.direction)]
+        for i, members in enumerate(parts):
+            lines.append('    part{}["部分 {} ({} 个节点)"]'.format(i + 1, i + 1, len(members)))
+        for (src, dst), count in cross.items():
+            lines.append('    part{} -->|{}| part{}'.format(src + 1, count, dst + 1))
+        for i in range(len(parts)):
+            lines.append('    click part{} href "{}"'.format(i + 1, link_template.format(i + 1)))
+        return '\n'.join(lines) + '\n'
+
+
+def _components(node_ids, adjacency):
+    """返回 node_ids 内部的连通分量"""
+    allowed = set(node_ids)
+    seen = set()
+    components = []
+    for node_id in node_ids:
+        if node_id in seen:
+            continue
+        component = []
+        queue = deque([node_id])
+        seen.add(node_id)
+        while queue:
+            current = queue.popleft()
+            component.append(current)
+            for neighbor in adjacency[current]:
+                if neighbor in allowed and neighbor not in seen:
+                    seen.add(neighbor)
+                    queue.append(neighbor)
+        components.append(component)
+    return components
+
+
+def _bfs_order(node_ids, adjacency):
+    """按广度优先顺序排列 node_ids，保持相邻节点靠近"""
+    return [node_id for component in _components(node_ids, adjacency) for node_id in component]
+
+
+def split_flowchart(mermaid_text, max_nodes=200, link_template='part_{:03d}.svg'):
+    """
+    将流程图拆分为多个子图
+
+    参数:
+        mermaid_text (str): Mermaid 语法文本
+        max_nodes (int): 每个子图的最大节点数，至少为 1
+        link_template (str): 索引图中指向各部分的链接模板，使用部分序号格式化
+
+    返回:
+        tuple: (各部分的 Mermaid 文本列表, 索引图 Mermaid 文本)，节点数未超过上限无需拆分时返回 None
+
+    异常:
+        SplitError: 不是流程图或无法解析，此时无法判断是否需要拆分
+    """
+    if max_nodes < 1:
+        raise ValueError(f'max_nodes 必须至少为 1: {max_nodes}')
+
+    graph = FlowGraph.parse(mermaid_text)
+    if len(graph.nodes) <= max_nodes:
+        return None
+
+    parts = graph.partition(max_nodes)
+    part_texts = [graph.render_part(members) for members in parts]
+    return part_texts, graph.render_index(parts, link_template)
@@ -6,15 +6,79 @@ Mermaid 流程图生成工具 - Web 界面
 
 import os
 import sys
+import argparse
+import hashlib
 import tempfile
+import threading
 import subprocess
 import webbrowser
-from flask import Flask, render_template_string, request, send_file, redirect, url_for
+from flask import Flask, render_template_string, request, send_file, redirect, url_for, jsonify
 from mermaid_generator import MermaidGenerator
 
+class SingleFlight:
+    """按键合并并发的相同请求：同一键同时只执行一次，其余调用等待并共享同一结果"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.requests = 0
+        self.executions = 0
+    
+    def do(self, key, fn):
+        """
+        执行 fn，如果相同 key 的调用正在进行，则等待其完成并返回同一结果
+        
+        参数:
+            key (str): 合并请求使用的键
+            fn (callable): 实际执行的函数
+            
+        返回:
+            fn 的返回值；执行中抛出异常时，等待者得到 None
+        """
+        with self._lock:
+            self.requests += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {'done': threading.Event(), 'result': None}
+                self._calls[key] = call
+                self.executions += 1
+        
+        if not leader:
+            call['done'].wait()
+            return call['result']
+        
+        try:
+            call['result'] = fn()
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call['done'].set()
+        return call['result']
+    
+    def stats(self):
+        """返回请求数、实际执行数、被合并的请求数及合并比例"""
+        with self._lock:
+            requests, executions = self.requests, self.executions
+            in_flight = len(self._calls)
+        coalesced = requests - executions
+        return {
+            'requests': requests,
+            'executions': executions,
+            'coalesced': coalesced,
+            'coalescing_ratio': coalesced / requests if requests else 0.0,
+            'in_flight': in_flight,
+        }
+
 app = Flask(__name__)
 generator = MermaidGenerator()
 current_image_path = None
+# 渲染器状态: warming (预热中), ready (就绪), failed (预热失败)
+renderer_status = 'ready'
+# 预热渲染器的最多尝试次数，重试间隔从 1 秒开始逐次加倍
+WARMUP_ATTEMPTS = 5
+# 相同的 Mermaid 文本同时提交时只生成一次
+render_flight = SingleFlight()
 
 # HTML 模板
 HTML_TEMPLATE = '''
@@ -197,8 +261,9 @@ def generate():
             timestamp=0
         )
     
-    # 生成流程图
-    output_path = generator.generate_from_text(mermaid_text)
+    # 生成流程图，并发提交的相同文本共享同一次生成结果
+    key = hashlib.sha256(mermaid_text.encode('utf-8')).hexdigest()
+    output_path = render_flight.do(key, lambda: generator.generate_from_text(mermaid_text))
     
     if output_path:
         current_image_path = output_path
@@ -233,7 +298,39 @@ def download():
         return send_file(current_image_path, as_attachment=True)
     return redirect(url_for('index'))
 
+@app.route('/healthz')
+def healthz():
+    """存活检查，进程能响应请求即返回正常"""
+    return jsonify(status='ok')
+
+@app.route('/readyz')
+def readyz():
+    """就绪检查，渲染器预热完成后才返回正常，供负载均衡器判断是否可以转发流量"""
+    if renderer_status == 'ready':
+        return jsonify(status=renderer_status)
+    return jsonify(status=renderer_status), 503
+
+@app.route('/stats')
+def stats():
+    """请求合并统计"""
+    return jsonify(render_flight.stats())
+
+def _on_warmup_finished(ok):
+    global renderer_status
+    renderer_status = 'ready' if ok else 'failed'
+    if ok:
+        print("渲染器预热完成")
+    else:
+        print("渲染器预热失败")
+
 def main():
+    global renderer_status
+    
+    parser = argparse.ArgumentParser(description='Mermaid 流程图生成工具 - Web 界面')
+    parser.add_argument('--warmup', action='store_true',
+                        help='启动时在后台预热渲染器，预热完成前 /readyz 返回 503')
+    args = parser.parse_args()
+    
     # 检查依赖
     try:
         import flask
@@ -252,6 +349,11 @@ def main():
         print("2. 运行: npm install -g @mermaid-js/mermaid-cli")
         sys.exit(1)
     
+    if args.warmup:
+        renderer_status = 'warming'
+        # 单次失败可能只是启动时的偶发问题，重试几次后才标记为失败
+        generator.warm_up_in_background(_on_warmup_finished, attempts=WARMUP_ATTEMPTS)
+    
     # 打开浏览器
     webbrowser.open('http://127.0.0.1:5000')
     
@@ -0,0 +1,23 @@
+/*
+ * mermaid.js 的离线替身，供测试 mermaid_render_server.js 使用
+ * 生成的 SVG 中带有 initialize 收到的配置，文本中包含 "syntax error" 时模拟解析失败，
+ * 包含 "hang" 时永不返回
+ */
+console.log('mermaid stand-in loaded');
+
+globalThis.mermaid = {
+  config: null,
+  initialize(config) {
+    this.config = config;
+  },
+  async render(id, text) {
+    console.log('rendering ' + id);
+    if (text.includes('syntax error')) {
+      throw new Error('Parse error on line 1');
+    }
+    if (text.includes('hang')) {
+      return new Promise(() => {});
+    }
+    return { svg: '<svg id="' + id + '" data-config=\'' + JSON.stringify(this.config) + '\'></svg>' };
+  },
+};
@@ -0,0 +1,19 @@
+/*
+ * 包装 mermaid_render_server.js：在第一个请求的响应之前向标准输出多写一行，
+ * 模拟不符合协议的输出
+ */
+'use strict';
+
+const path = require('path');
+
+const write = process.stdout.write.bind(process.stdout);
+let strayed = false;
+process.stdout.write = function (chunk, ...rest) {
+  if (!strayed && String(chunk).startsWith('{"id":1,')) {
+    strayed = true;
+    write('stray output\n');
+  }
+  return write(chunk, ...rest);
+};
+
+require(path.join(__dirname, '..', 'mermaid_render_server.js'));
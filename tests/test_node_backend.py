@@ -0,0 +1,88 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mermaid_node_backend
+from mermaid_generator import MermaidGenerator
+from mermaid_node_backend import NodeMermaidGenerator, _parse_message
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+STANDIN_BUNDLE = os.path.join(TESTS_DIR, 'mermaid_standin.js')
+STRAY_OUTPUT_SERVER = os.path.join(TESTS_DIR, 'stray_output_server.js')
+
+
+@unittest.skipIf(shutil.which('node') is None, '需要 Node.js')
+class NodeMermaidGeneratorTest(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+    def _generator(self, bundle_path, **kwargs):
+        generator = NodeMermaidGenerator(bundle_path=bundle_path, **kwargs)
+        self.addCleanup(generator.close)
+        return generator
+
+    def test_renders_svg_in_process(self):
+        generator = self._generator(STANDIN_BUNDLE)
+        output_path = os.path.join(self.output_dir, 'out.svg')
+
+        with mock.patch.object(MermaidGenerator, 'generate_from_text') as mmdc:
+            self.assertEqual(generator.generate_from_text('graph TD; A-->B;', output_path, 'svg'), output_path)
+            # 同一进程可以连续处理多个请求
+            self.assertIsNotNone(generator.generate_from_text('graph TD; B-->C;', output_path, 'svg'))
+        mmdc.assert_not_called()
+
+        with open(output_path, encoding='utf-8') as f:
+            svg = f.read()
+        self.assertIn('id="mermaid-2"', svg)
+        self.assertIn('"htmlLabels":false', svg)
+
+    def test_render_error_returns_none(self):
+        generator = self._generator(STANDIN_BUNDLE)
+        output_path = os.path.join(self.output_dir, 'bad.svg')
+
+        self.assertIsNone(generator.generate_from_text('syntax error', output_path, 'svg'))
+        self.assertFalse(os.path.exists(output_path))
+        # 出错后进程仍可继续使用
+        self.assertEqual(generator.generate_from_text('graph TD; A-->B;', output_path, 'svg'), output_path)
+
+    def test_stray_output_restarts_process(self):
+        generator = self._generator(STANDIN_BUNDLE)
+
+        with mock.patch.object(mermaid_node_backend, 'SERVER_SCRIPT', STRAY_OUTPUT_SERVER):
+            self.assertIsNone(generator.render_svg('graph TD; A-->B;'))
+            # 重启后的进程不再残留上一个请求的响应，每次都得到自己的结果
+            self.assertIn('id="mermaid-2"', generator.render_svg('graph TD; B-->C;'))
+            self.assertIn('id="mermaid-3"', generator.render_svg('graph TD; C-->D;'))
+
+    def test_hung_render_times_out(self):
+        generator = self._generator(STANDIN_BUNDLE, timeout=1)
+
+        self.assertIsNone(generator.render_svg('hang'))
+        self.assertIn('id="mermaid-2"', generator.render_svg('graph TD; A-->B;'))
+
+    def test_startup_failure_falls_back_to_mmdc(self):
+        generator = self._generator(os.path.join(self.output_dir, 'missing.js'))
+        generator._mmdc_checked = True
+        output_path = os.path.join(self.output_dir, 'out.svg')
+
+        with mock.patch.object(MermaidGenerator, 'generate_from_text', return_value=output_path) as mmdc:
+            self.assertEqual(generator.generate_from_text('graph TD; A-->B;', output_path, 'svg'), output_path)
+            self.assertEqual(generator.generate_from_text('graph TD; A-->B;', output_path, 'svg'), output_path)
+        self.assertEqual(mmdc.call_count, 2)
+
+
+class ParseMessageTest(unittest.TestCase):
+    def test_non_json_line_is_an_error(self):
+        self.assertIn('error', _parse_message('loaded\n'))
+        self.assertIn('error', _parse_message('[1, 2]\n'))
+        self.assertEqual(_parse_message('{"ready": true}\n'), {'ready': True})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mermaid_splitter import FlowGraph, SplitError, split_flowchart
+
+
+class ParseTest(unittest.TestCase):
+    def test_link_forms(self):
+        graph = FlowGraph.parse('\n'.join([
+            'graph LR',
+            'A --> B',
+            'B --- C',
+            'C -.-> D',
+            'D ==> E',
+            'E --o F',
+            'F --x G',
+            'G <--> H',
+            'H -->|是| I',
+            'I -- 否 --> J',
+            'J -- o --> K',
+        ]))
+        self.assertEqual(graph.edges, [
+            ('A', '-->', 'B'),
+            ('B', '---', 'C'),
+            ('C', '-.->', 'D'),
+            ('D', '==>', 'E'),
+            ('E', '--o', 'F'),
+            ('F', '--x', 'G'),
+            ('G', '<-->', 'H'),
+            ('H', '-->|是|', 'I'),
+            ('I', '-- 否 -->', 'J'),
+            ('J', '-- o -->', 'K'),
+        ])
+        self.assertNotIn('o', graph.nodes)
+
+    def test_shapes_and_semicolons(self):
+        graph = FlowGraph.parse('graph TD; A[开始; 结束] --> B{判断}; B --> C((圆)); C --> D[(库)]')
+        self.assertEqual(graph.direction, 'TD')
+        self.assertEqual(list(graph.nodes.items()), [
+            ('A', '[开始; 结束]'), ('B', '{判断}'), ('C', '((圆))'), ('D', '[(库)]'),
+        ])
+
+    def test_ampersand_groups_and_chains(self):
+        graph = FlowGraph.parse('graph TD\nA & B --> C --> D & E')
+        self.assertEqual(graph.edges, [
+            ('A', '-->', 'C'), ('B', '-->', 'C'), ('C', '-->', 'D'), ('C', '-->', 'E'),
+        ])
+
+    def test_hyphenated_ids(self):
+        graph = FlowGraph.parse('graph TD\nmy-n1 --> my-n2\nsubgraph my-sg\nmy-n3\nend')
+        self.assertEqual(list(graph.nodes), ['my-n1', 'my-n2', 'my-n3'])
+        self.assertEqual(graph.subgraph_ids, {'my-sg': 0})
+
+    def test_nested_subgraphs_belong_to_top_level(self):
+        graph = FlowGraph.parse('\n'.join([
+            'graph TD',
+            'subgraph outer',
+            '  A --> B',
+            '  subgraph inner',
+            '    direction LR',
+            '    C --> D',
+            '  end',
+            'end',
+            'E --> A',
+        ]))
+        self.assertEqual(graph.owner, {'A': 0, 'B': 0, 'C': 0, 'D': 0, 'E': None})
+        self.assertEqual(graph.subgraph_ids, {'outer': 0, 'inner': 0})
+        self.assertEqual(graph.top_subgraph_ids, {'outer'})
+
+    def test_subgraph_ids_are_not_nodes(self):
+        graph = FlowGraph.parse('graph TD\nsubgraph one\nA\nend\nsubgraph two\nB\nend\none --> two')
+        self.assertEqual(list(graph.nodes), ['A', 'B'])
+        self.assertIn(('one', '-->', 'two'), graph.edges)
+
+    def test_not_a_flowchart(self):
+        with self.assertRaises(SplitError):
+            FlowGraph.parse('sequenceDiagram\nA->>B: hi')
+
+    def test_unparsable_statement(self):
+        with self.assertRaises(SplitError):
+            FlowGraph.parse('graph TD\nA --> B\n!!! --> C')
+
+
+class SplitTest(unittest.TestCase):
+    def test_small_graph_is_not_split(self):
+        self.assertIsNone(split_flowchart('graph TD\nA --> B', max_nodes=2))
+
+    def test_max_nodes_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            split_flowchart('graph TD\nA --> B', max_nodes=0)
+
+    def test_parts_are_bounded_and_index_counts_cross_edges(self):
+        text = 'graph LR\n' + '\n'.join(f'N{i} --> N{i + 1}' for i in range(9))
+        part_texts, index_text = split_flowchart(text, max_nodes=4, link_template='part_{:03d}.png')
+
+        self.assertEqual(len(part_texts), 3)
+        self.assertIn('N0 --> N1', part_texts[0])
+        self.assertNotIn('N3 --> N4', part_texts[0])
+        self.assertIn('part1 -->|1| part2', index_text)
+        self.assertIn('part2 -->|1| part3', index_text)
+        self.assertIn('click part3 href "part_003.png"', index_text)
+
+    def test_subgraph_edges_link_their_parts(self):
+        text = '\n'.join([
+            'graph TD',
+            'subgraph one', 'A1 --> A2', 'end',
+            'subgraph two', 'B1 --> B2', 'end',
+            'one --> two',
+            'A2 --> B1',
+        ])
+        part_texts, index_text = split_flowchart(text, max_nodes=2)
+
+        self.assertEqual(len(part_texts), 2)
+        self.assertIn('subgraph one', part_texts[0])
+        self.assertIn('subgraph two', part_texts[1])
+        self.assertIn('part1 -->|2| part2', index_text)
+
+        # 两个子图在同一部分时，指向子图的连线保留在该部分中
+        part_texts, _ = split_flowchart(text + '\nC', max_nodes=4)
+        self.assertIn('one --> two', part_texts[0])
+
+    def test_style_statements_follow_their_nodes(self):
+        text = '\n'.join([
+            'graph TD',
+            'A --> B',
+            'C --> D',
+            'classDef red fill:#f00',
+            'class A,D red',
+            'style C fill:#0f0',
+        ])
+        part_texts, _ = split_flowchart(text, max_nodes=2)
+
+        self.assertIn('class A red', part_texts[0])
+        self.assertNotIn('class D red', part_texts[0])
+        self.assertIn('style C fill:#0f0', part_texts[1])
+        for part_text in part_texts:
+            self.assertIn('classDef red fill:#f00', part_text)
+
+    def test_init_directives_are_kept(self):
+        directive = '%%{init: {"theme": "dark"}}%%'
+        text = directive + '\ngraph TD\n%% 注释\nA --> B\nC --> D'
+        part_texts, index_text = split_flowchart(text, max_nodes=2)
+
+        for diagram in part_texts + [index_text]:
+            self.assertTrue(diagram.startswith(directive + '\ngraph TD\n'))
+            self.assertNotIn('注释', diagram)
+
+
+if __name__ == '__main__':
+    unittest.main()